@@ -1,6 +1,8 @@
 import plotly.io as pio
 import plotly.graph_objects as go
 
+__all__ = ['custom_colors', 'custom_template', 'register']
+
 # Define the custom color palette
 custom_colors = {
     'blue': '#1f77b4',
@@ -45,5 +47,8 @@ custom_template = go.layout.Template(
     )
 )
 
-# Register the custom template with Plotly
-pio.templates['custom_template'] = custom_template
\ No newline at end of file
+# Register the custom template with Plotly on request only, so importing this
+# module has no global side effects (the notebooks layer it over plotly_white)
+def register(name='custom_template'):
+    pio.templates[name] = custom_template
+    return custom_template
@@ -1,15 +1,80 @@
 # dynamics_multicore.py
+import numpy as np
 import pandas as pd
+import polars as pl
 import os
-from io import BytesIO
-from textblob import TextBlob
-
+import pickle
+from functools import lru_cache
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from textblob.en import sentiment as pattern_sentiment
+
+# PublishDate layout in News_Final.csv, e.g. "2015-11-01 12:34:00"
+PUBLISH_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Polars dt.weekday() numbering (ISO: Monday = 1)
+DAY_NAMES = {1: "Monday", 2: "Tuesday", 3: "Wednesday", 4: "Thursday", 5: "Friday", 6: "Saturday", 7: "Sunday"}
+
+# Low-cardinality group-by keys, dictionary-encoded by the Arrow reader so that
+# Polars groups on integer codes (Categorical) instead of hashing strings
+CATEGORICAL_COLS = {c: pa.dictionary(pa.int32(), pa.string()) for c in ["Platform", "Topic", "Source_Tier"]}
+
+# Metrics that are only summed are parsed as float32 (half the bytes per row);
+# aggregate_sum_count accumulates them in float64. Binning inputs (sentiment,
+# complexity, opportunity) stay float64 so values on a cut point keep their bin.
+METRIC_DTYPES = {c: pa.float32() for c in ["Popularity", "Initial_Velocity", "Stickiness_Index"]}
+
+# Column types for the Polars aggregation workers
+AGG_COLUMN_TYPES = {**CATEGORICAL_COLS, **METRIC_DTYPES}
+
+# Arrow-backed strings with NaN for missing values (the pandas 3 default "str" dtype).
+# Text columns stay in contiguous Arrow buffers, which pickle back from the workers
+# several times faster than object columns. Older pandas falls back to object.
+try:
+    ARROW_STRING_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+except TypeError:
+    ARROW_STRING_DTYPE = None
 
 def get_file_chunks(file_path, n_chunks):
+    """
+    Splits a file into n_chunks byte ranges, aligning to newlines.
+    Offsets are cached per (file, mtime, size, n_chunks): in-process and in a
+    "<file>.offsets.<n_chunks>.pkl" sidecar, so every phase reuses one scan
+    until the file is rewritten.
+    """
+    stat = os.stat(file_path)
+    return list(get_file_chunks_cached(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, n_chunks))
+
+
+@lru_cache(maxsize=8)
+def get_file_chunks_cached(file_path, mtime_ns, file_size, n_chunks):
+    """
+    Returns the byte ranges for this exact file version, from the sidecar when it matches.
+    """
+    key = (mtime_ns, file_size)
+    sidecar_path = f"{file_path}.offsets.{n_chunks}.pkl"
+    try:
+        with open(sidecar_path, "rb") as f:
+            cached_key, offsets = pickle.load(f)
+        if cached_key == key:
+            return tuple(offsets)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        pass
+
+    offsets = scan_file_chunks(file_path, n_chunks, file_size)
+    try:
+        with open(sidecar_path, "wb") as f:
+            pickle.dump((key, offsets), f)
+    except OSError:
+        pass  # Read-only location: the in-process cache still applies
+    return tuple(offsets)
+
+
+def scan_file_chunks(file_path, n_chunks, file_size):
     """
     Splits a file into n_chunks byte ranges, aligning to newlines.
     """
-    file_size = os.path.getsize(file_path)
     chunk_size = file_size // n_chunks
 
     offsets = []
@@ -31,20 +96,120 @@ def get_file_chunks(file_path, n_chunks):
     return offsets
 
 
+def read_csv_table(file_path, start_byte, num_bytes, header_names, use_cols=None, column_types=None):
+    """
+    Reads a byte range into an Arrow Table using the multithreaded PyArrow CSV reader.
+    If start_byte > 0, assigns header_names manually.
+    column_types optionally fixes Arrow types per column (e.g. CATEGORICAL_COLS).
+    """
+    # Keep the pandas contract so the workers' EmptyDataError handling still applies
+    if num_bytes == 0:
+        raise pd.errors.EmptyDataError("No columns to parse from file")
+
+    # If we are at the start, let Arrow find the header.
+    # If we are in the middle, there is no header, so we provide the names.
+    read_options = pacsv.ReadOptions(column_names=header_names if start_byte > 0 else None)
+    # Keep the file's column order, as pandas' usecols does
+    if use_cols is not None:
+        use_cols = [c for c in header_names if c in use_cols]
+    # Titles and Headlines may contain quoted line breaks
+    parse_options = pacsv.ParseOptions(delimiter=",", newlines_in_values=True)
+    # Empty strings become nulls, matching pandas' NaN handling
+    convert_options = pacsv.ConvertOptions(
+        include_columns=use_cols, column_types=column_types, strings_can_be_null=True
+    )
+
+    # Parse straight out of the page cache: read_buffer on a memory map is a zero-copy
+    # slice, unlike f.read(). The map is closed on return, so no worker keeps the file
+    # open while the notebook replaces it between phases.
+    with pa.memory_map(file_path, "r") as source:
+        source.seek(start_byte)
+        data = source.read_buffer(num_bytes)
+        try:
+            return pacsv.read_csv(
+                pa.BufferReader(data),
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options,
+            )
+        except pa.ArrowInvalid as e:
+            if str(e).startswith("Empty CSV file"):
+                raise pd.errors.EmptyDataError("No columns to parse from file") from e
+            raise
+
+
 def read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=None):
     """
-    Reads a byte range. If start_byte > 0, assigns header_names manually.
+    Reads a byte range into a pandas DataFrame (see read_csv_table).
     """
-    with open(file_path, "rb") as f:
-        f.seek(start_byte)
-        data = f.read(num_bytes)
+    table = read_csv_table(file_path, start_byte, num_bytes, header_names, use_cols=use_cols)
+    return table.to_pandas(
+        split_blocks=True,
+        self_destruct=True,
+        types_mapper=lambda t: ARROW_STRING_DTYPE if t == pa.string() else None,
+    )
 
-    # If we are at the start, let pandas find the header.
-    # If we are in the middle, tell pandas there is no header, and provide names.
-    if start_byte == 0:
-        return pd.read_csv(BytesIO(data), usecols=use_cols)
+
+def write_shard(df, output_path):
+    """
+    Writes a header-less CSV shard with the multithreaded Arrow CSV writer.
+    Shards are binary-appended under a single header afterwards, so they stay
+    plain, uncompressed CSV: later phases byte-range read the consolidated file.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pacsv.write_csv(table, output_path, write_options=pacsv.WriteOptions(include_header=False))
+
+
+def broadcast_left_join(chunk, right_df, keys):
+    """
+    pd.merge(chunk, right_df, on=keys, how='left') for a small right_df with unique keys.
+    Probes a hash index of right_df and adds its columns to chunk in place, so the
+    wide chunk is never copied; falls back to pd.merge if the keys are not unique.
+    """
+    right = right_df.set_index(keys)
+    if not right.index.is_unique or chunk.columns.intersection(right.columns).size:
+        return pd.merge(chunk, right_df, on=keys, how="left")
+
+    probe = pd.MultiIndex.from_frame(chunk[keys]) if len(keys) > 1 else pd.Index(chunk[keys[0]])
+    matched = right.reindex(probe)
+    for col in matched.columns:
+        chunk[col] = matched[col].array
+    return chunk
+
+
+def read_csv_lazy(file_path, start_byte, num_bytes, header_names, use_cols=None, column_types=None):
+    """
+    Reads a byte range into a Polars LazyFrame (zero-copy over the Arrow Table).
+    """
+    table = read_csv_table(file_path, start_byte, num_bytes, header_names, use_cols=use_cols, column_types=column_types)
+    return pl.from_arrow(table).lazy()
+
+
+def aggregate_sum_count(lf, keys, metric_cols, presummed=False):
+    """
+    Polars equivalent of df.groupby(keys)[metric_cols].agg(['sum', 'count']).
+    Rows with a null key are dropped, as pandas does. Only observed groups are
+    returned, in no particular order (like groupby(sort=False, observed=True));
+    the notebook's reduce step sorts once. Returns the pandas layout the notebook
+    reduces: keys as the index, (metric, 'sum'/'count') columns.
+    With presummed=True, lf holds {metric}_sum / {metric}_count partials from a
+    finer group_by, which are summed again.
+    """
+    if presummed:
+        aggs = [pl.col(f"{c}_{stat}").sum() for c in metric_cols for stat in ("sum", "count")]
     else:
-        return pd.read_csv(BytesIO(data), header=None, names=header_names, usecols=use_cols)
+        aggs = [pl.col(c).cast(pl.Float64).sum().alias(f"{c}_sum") for c in metric_cols]
+        aggs += [pl.col(c).count().cast(pl.Int64).alias(f"{c}_count") for c in metric_cols]
+
+    agg = lf.drop_nulls(subset=keys).group_by(keys).agg(aggs).collect()
+
+    # Hand back plain labels; per-chunk dictionaries would not line up in pd.concat
+    agg = agg.with_columns(pl.col(k).cast(pl.String) for k in keys if k in CATEGORICAL_COLS)
+
+    result = agg.to_pandas().set_index(keys)
+    result = result[[f"{c}_{stat}" for c in metric_cols for stat in ("sum", "count")]]
+    result.columns = pd.MultiIndex.from_product([metric_cols, ["sum", "count"]])
+    return result
 
 
 def process_phase1_range(file_path, start_byte, num_bytes, header_names):
@@ -54,45 +219,63 @@ def process_phase1_range(file_path, start_byte, num_bytes, header_names):
     calc_cols = ["IDLink", "Platform", "TimeSlice", "Popularity"]
 
     try:
-        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=calc_cols)
+        lf = read_csv_lazy(
+            file_path, start_byte, num_bytes, header_names, use_cols=calc_cols, column_types=CATEGORICAL_COLS
+        )
     except pd.errors.EmptyDataError:
         return None, None
 
-    if chunk.empty:
-        return None, None
-
     # 1. Initial Velocity Candidates
-    v_chunk = chunk[chunk["TimeSlice"] == 1][["IDLink", "Platform", "Popularity"]].copy()
-    v_chunk.rename(columns={"Popularity": "Initial_Velocity"}, inplace=True)
+    v_query = (
+        lf.filter(pl.col("TimeSlice") == 1)
+        .select(["IDLink", pl.col("Platform").cast(pl.String), pl.col("Popularity").alias("Initial_Velocity")])
+    )
 
     # 2. Partial Max Scores
-    m_chunk = chunk.groupby(["IDLink", "Platform"])["Popularity"].max().reset_index()
-    m_chunk.rename(columns={"Popularity": "Final_Score"}, inplace=True)
+    m_query = (
+        lf.drop_nulls(subset=["IDLink", "Platform"])
+        .group_by(["IDLink", "Platform"])
+        .agg(pl.col("Popularity").max().alias("Final_Score"))
+        .with_columns(pl.col("Platform").cast(pl.String))
+    )
+
+    # Both queries share one scan of the chunk
+    v_chunk, m_chunk = pl.collect_all([v_query, m_query])
+
+    if m_chunk.is_empty():
+        return None, None
 
-    return v_chunk, m_chunk
+    return v_chunk.to_pandas(), m_chunk.to_pandas()
 
 
 def process_phase2_merge(file_path, start_byte, num_bytes, header_names, metrics_df, output_path, cols_to_clean):
     """
     Worker for Phase 2: Read byte range -> Merge Metrics -> Write Shard
     """
+    # Columns being replaced are skipped by the reader instead of parsed and dropped
+    keep_cols = [c for c in header_names if c not in cols_to_clean]
     try:
-        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=None)
+        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=keep_cols)
     except pd.errors.EmptyDataError:
         return
 
     if chunk.empty:
         return
 
-    existing = [c for c in cols_to_clean if c in chunk.columns]
-    if existing:
-        chunk.drop(columns=existing, inplace=True)
-
-    merged_chunk = pd.merge(chunk, metrics_df, on=["IDLink", "Platform"], how="left")
+    merged_chunk = broadcast_left_join(chunk, metrics_df, ["IDLink", "Platform"])
 
     # Write without header to allow easy concatenation later
-    merged_chunk.to_csv(output_path, mode="w", index=False, header=False)
+    write_shard(merged_chunk, output_path)
+
+
 
+def first_per_id(chunk):
+    """
+    Keeps the first row of each IDLink, in file order (drop_duplicates(subset=['IDLink'])).
+    IDLink is numeric, so np.unique's sort beats pandas' hash-table dedup.
+    """
+    first_idx = np.unique(chunk["IDLink"].to_numpy(), return_index=True)[1]
+    return chunk.iloc[np.sort(first_idx)]
 
 
 def process_extract_unique_nlp(file_path, start_byte, num_bytes, header_names):
@@ -109,40 +292,40 @@ def process_extract_unique_nlp(file_path, start_byte, num_bytes, header_names):
         return None
 
     # Return only unique IDs within this chunk to save memory during transfer
-    return chunk.drop_duplicates(subset=["IDLink"])
+    return first_per_id(chunk)
 
 
 def process_nlp_calculation(df_chunk):
     """
     Worker: Calculates Sentiment and Complexity on a chunk of unique articles.
+    Runs single-threaded on purpose: the caller already splits the articles across
+    one process per core, so threading inside a worker would only oversubscribe.
     """
 
-    # Helper functions nested or local to ensure pickle compatibility
-    def get_sentiment(text):
-        try:
-            return TextBlob(str(text)).sentiment.polarity
-        except:
-            return 0.0
-
-    def get_complexity(text):
-        try:
-            s = str(text)
-            words = s.split()
-            if not words:
-                return 0.0
-            avg_len = sum(len(w) for w in words) / len(words)
-            return len(words) + avg_len
-        except:
-            return 0.0
-
     # Avoid SettingWithCopyWarning
     df = df_chunk.copy()
 
     # Calculate
-    df["Title_Sentiment"] = df["Title"].apply(get_sentiment)
-    df["Headline_Sentiment"] = df["Headline"].apply(get_sentiment)
+    # Score each distinct text once; Title and Headline share the lookup.
+    # Missing and empty texts are never scored and default to 0.0.
+    texts = pd.unique(pd.concat([df["Title"], df["Headline"]], ignore_index=True).dropna())
+    texts = texts[texts != ""]
+    # Same PatternAnalyzer scorer TextBlob(...).sentiment uses, without the blob
+    polarity = pd.Series([pattern_sentiment(t)[0] for t in texts], index=texts, dtype=np.float64)
+
+    df["Title_Sentiment"] = df["Title"].map(polarity).fillna(0.0)
+    df["Headline_Sentiment"] = df["Headline"].map(polarity).fillna(0.0)
     df["Sentiment_Divergence"] = (df["Title_Sentiment"] - df["Headline_Sentiment"]).abs()
-    df["Title_Complexity"] = df["Title"].apply(get_complexity)
+
+    # Complexity = word count + mean word length, computed with Arrow string kernels.
+    # Trimming first makes Arrow's Unicode whitespace split match str.split().
+    titles = pa.array(df["Title"], type=pa.string(), from_pandas=True)
+    words = pc.utf8_split_whitespace(pc.utf8_trim_whitespace(titles))
+    n_words = pc.list_value_length(words).to_numpy(zero_copy_only=False).astype(np.float64)
+    n_chars = pc.utf8_length(pc.binary_join(words, "")).to_numpy(zero_copy_only=False).astype(np.float64)
+    # Missing or blank titles have no words (n_chars is 0 or NaN) and score 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["Title_Complexity"] = np.where(n_chars > 0, n_words + n_chars / n_words, 0.0)
 
     # Return only the calculated features + key
     return df[["IDLink", "Title_Sentiment", "Sentiment_Divergence", "Title_Complexity"]]
@@ -152,31 +335,26 @@ def process_nlp_merge(file_path, start_byte, num_bytes, header_names, nlp_df, ou
     """
     Worker: Merges NLP features back into the master dataset shards.
     """
+    # Skip existing NLP columns (to prevent duplicates during re-runs); they are never converted
+    keep_cols = [c for c in header_names if c not in cols_to_clean]
     try:
-        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=None)
+        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=keep_cols)
     except pd.errors.EmptyDataError:
         return
 
     if chunk.empty:
         return
 
-    # Drop existing NLP columns if they exist (to prevent duplicates during re-runs)
-    existing = [c for c in cols_to_clean if c in chunk.columns]
-    if existing:
-        chunk.drop(columns=existing, inplace=True)
-
     # Efficient Left Merge
-    merged_chunk = pd.merge(chunk, nlp_df, on="IDLink", how="left")
+    merged_chunk = broadcast_left_join(chunk, nlp_df, ["IDLink"])
 
     # Fill NaNs created by the merge (if any ID didn't have text data) with 0
     fill_cols = ["Title_Sentiment", "Sentiment_Divergence", "Title_Complexity"]
-    # Note: Using a loop is safer than fillna(dict) in recent pandas versions for memory
-    for c in fill_cols:
-        if c in merged_chunk.columns:
-            merged_chunk[c] = merged_chunk[c].fillna(0.0)
+    # One in-place pass over the block instead of a new Series per column
+    merged_chunk.fillna({c: 0.0 for c in fill_cols if c in merged_chunk.columns}, inplace=True)
 
     # Write shard
-    merged_chunk.to_csv(output_path, mode="w", index=False, header=False)
+    write_shard(merged_chunk, output_path)
 
 
 def process_extract_unique_date(file_path, start_byte, num_bytes, header_names):
@@ -192,37 +370,34 @@ def process_extract_unique_date(file_path, start_byte, num_bytes, header_names):
     if chunk.empty:
         return None
         
-    return chunk.drop_duplicates(subset=['IDLink'])
+    return first_per_id(chunk)
 
 def process_market_merge(file_path, start_byte, num_bytes, header_names, market_df, output_path, cols_to_clean):
     """
     Worker: Merges Market features back into the master dataset shards.
     """
+    # Skip existing columns at read time
+    keep_cols = [c for c in header_names if c not in cols_to_clean]
     try:
-        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=None)
+        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=keep_cols)
     except pd.errors.EmptyDataError:
         return
 
     if chunk.empty:
         return
 
-    # Drop existing columns if they exist
-    existing = [c for c in cols_to_clean if c in chunk.columns]
-    if existing:
-        chunk.drop(columns=existing, inplace=True)
-
     # Efficient Left Merge
-    merged_chunk = pd.merge(chunk, market_df, on="IDLink", how="left")
+    merged_chunk = broadcast_left_join(chunk, market_df, ["IDLink"])
     
     # Fill NaNs
     # If date was missing, Opportunity Score is technically unknown. 
     # We can fill with 0 or the median. 
     # Given the formula 1/count, 0 implies "infinite saturation" (worst case), which is a safe safe-fail.
-    if 'Opportunity_Score' in merged_chunk.columns:
-        merged_chunk['Opportunity_Score'] = merged_chunk['Opportunity_Score'].fillna(0.0)
+    fill_cols = ['Opportunity_Score']
+    merged_chunk.fillna({c: 0.0 for c in fill_cols if c in merged_chunk.columns}, inplace=True)
 
     # Write shard
-    merged_chunk.to_csv(output_path, mode='w', index=False, header=False)
+    write_shard(merged_chunk, output_path)
 
 
 
@@ -247,7 +422,11 @@ def process_content_sampling(file_path, start_byte, num_bytes, header_names):
         return None
         
     # Return 1% sample
-    return valid_data.sample(frac=0.01, random_state=42)
+    # Bernoulli mask: one uniform draw per row and a boolean gather, no permutation.
+    # Seeding on the chunk offset keeps it reproducible without every chunk drawing
+    # the same row positions.
+    rng = np.random.default_rng([42, start_byte])
+    return valid_data[rng.random(len(valid_data)) < 0.01]
 
 
 def process_content_aggregation(file_path, start_byte, num_bytes, header_names, comp_low, comp_high):
@@ -265,37 +444,32 @@ def process_content_aggregation(file_path, start_byte, num_bytes, header_names,
     metric_cols = ['Popularity', 'Initial_Velocity', 'Stickiness_Index']
 
     try:
-        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=cols_to_use)
+        lf = read_csv_lazy(
+            file_path, start_byte, num_bytes, header_names, use_cols=cols_to_use, column_types=AGG_COLUMN_TYPES
+        )
     except pd.errors.EmptyDataError:
         return None
 
-    if chunk.empty:
-        return None
-
     # --- 1. Sentiment Binning ---
     # Fixed thresholds: Negative < -0.1, Positive > 0.1
-    chunk['Sentiment_Bin'] = pd.cut(
-        chunk['Title_Sentiment'], 
-        bins=[-float('inf'), -0.1, 0.1, float('inf')], 
-        labels=['Negative', 'Neutral', 'Positive']
-    )
-
     # --- 2. Complexity Binning ---
     # Dynamic thresholds passed from main thread
-    chunk['Complexity_Bin'] = pd.cut(
-        chunk['Title_Complexity'],
-        bins=[-float('inf'), comp_low, comp_high, float('inf')],
-        labels=['Simple', 'Standard', 'Complex']
+    lf = lf.with_columns(
+        pl.col('Title_Sentiment').cut([-0.1, 0.1], labels=['Negative', 'Neutral', 'Positive']).alias('Sentiment_Bin'),
+        pl.col('Title_Complexity').cut([comp_low, comp_high], labels=['Simple', 'Standard', 'Complex']).alias('Complexity_Bin'),
     )
 
     # --- 3. Local Aggregation ---
     # We return the Sums and Counts. The main thread will calculate the weighted Mean.
     
     # Group by Platform + Sentiment
-    sent_agg = chunk.groupby(['Platform', 'Sentiment_Bin'], observed=False)[metric_cols].agg(['sum', 'count'])
+    sent_agg = aggregate_sum_count(lf, ['Platform', 'Sentiment_Bin'], metric_cols)
     
     # Group by Platform + Complexity
-    comp_agg = chunk.groupby(['Platform', 'Complexity_Bin'], observed=False)[metric_cols].agg(['sum', 'count'])
+    comp_agg = aggregate_sum_count(lf, ['Platform', 'Complexity_Bin'], metric_cols)
+
+    if sent_agg.empty and comp_agg.empty:
+        return None
 
     return sent_agg, comp_agg
 
@@ -314,43 +488,61 @@ def process_context_aggregation(file_path, start_byte, num_bytes, header_names):
     metric_cols = ['Popularity', 'Initial_Velocity', 'Stickiness_Index']
 
     try:
-        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=cols_to_use)
+        lf = read_csv_lazy(
+            file_path, start_byte, num_bytes, header_names, use_cols=cols_to_use, column_types=AGG_COLUMN_TYPES
+        )
     except pd.errors.EmptyDataError:
         return None
 
-    if chunk.empty:
-        return None
-
     # --- Pre-processing ---
     # 1. Date Extraction
-    chunk['PublishDate'] = pd.to_datetime(chunk['PublishDate'], errors='coerce')
-    chunk = chunk.dropna(subset=['PublishDate'])
-    chunk['hour_of_day'] = chunk['PublishDate'].dt.hour
-    chunk['day_of_week'] = chunk['PublishDate'].dt.day_name()
+    # Arrow's reader already parses clean ISO timestamps. A chunk with a malformed
+    # date stays a string column; parse it with the known format, coercing bad rows.
+    if lf.collect_schema()['PublishDate'] == pl.String:
+        lf = lf.with_columns(pl.col('PublishDate').str.to_datetime(PUBLISH_DATE_FORMAT, strict=False))
+    # Group on the integer weekday; names are attached to the 7 result rows only
+    lf = lf.drop_nulls(subset=['PublishDate']).with_columns(
+        pl.col('PublishDate').dt.hour().alias('hour_of_day'),
+        pl.col('PublishDate').dt.weekday().alias('day_of_week'),
+    )
 
     # 2. Opportunity Binning (Physical Meaning)
     # Score = 1/N. 
     # < 0.02 means > 50 competitors (Red Ocean)
     # > 0.1 means < 10 competitors (Blue Ocean)
-    chunk['Opportunity_Bin'] = pd.cut(
-        chunk['Opportunity_Score'],
-        bins=[-float('inf'), 0.02, 0.1, float('inf')],
-        labels=['Red Ocean (High Comp)', 'Average', 'Blue Ocean (Low Comp)']
+    lf = lf.with_columns(
+        pl.col('Opportunity_Score').cut(
+            [0.02, 0.1],
+            labels=['Red Ocean (High Comp)', 'Average', 'Blue Ocean (Low Comp)']
+        ).alias('Opportunity_Bin')
     )
 
     # --- Aggregations ---
+    # One fused group_by over every context key touches the metric columns once.
+    # Null keys are kept as groups here and only dropped per dimension below.
+    context_keys = ['Platform', 'hour_of_day', 'day_of_week', 'Source_Tier', 'Opportunity_Bin']
+    partial_aggs = [pl.col(c).cast(pl.Float64).sum().alias(f"{c}_sum") for c in metric_cols]
+    partial_aggs += [pl.col(c).count().cast(pl.Int64).alias(f"{c}_count") for c in metric_cols]
+    fused = lf.group_by(context_keys).agg(partial_aggs).collect()
+
+    if fused.is_empty():
+        return None
+
+    # Each dimension is a marginal of the (small) fused result
+    fused = fused.lazy()
     
     # 1. Hourly
-    agg_hourly = chunk.groupby(['Platform', 'hour_of_day'], observed=False)[metric_cols].agg(['sum', 'count'])
+    agg_hourly = aggregate_sum_count(fused, ['Platform', 'hour_of_day'], metric_cols, presummed=True)
     
     # 2. Weekly
-    agg_weekly = chunk.groupby(['Platform', 'day_of_week'], observed=False)[metric_cols].agg(['sum', 'count'])
+    agg_weekly = aggregate_sum_count(fused, ['Platform', 'day_of_week'], metric_cols, presummed=True)
+    agg_weekly = agg_weekly.rename(index=DAY_NAMES, level='day_of_week')
     
     # 3. Source Tier
-    agg_source = chunk.groupby(['Platform', 'Source_Tier'], observed=False)[metric_cols].agg(['sum', 'count'])
+    agg_source = aggregate_sum_count(fused, ['Platform', 'Source_Tier'], metric_cols, presummed=True)
     
     # 4. Opportunity
-    agg_opp = chunk.groupby(['Platform', 'Opportunity_Bin'], observed=False)[metric_cols].agg(['sum', 'count'])
+    agg_opp = aggregate_sum_count(fused, ['Platform', 'Opportunity_Bin'], metric_cols, presummed=True)
 
     return agg_hourly, agg_weekly, agg_source, agg_opp
 
@@ -383,9 +575,9 @@ def process_quadrant_extraction(file_path, start_byte, num_bytes, header_names):
     chunk = chunk.dropna(subset=['Initial_Velocity', 'Stickiness_Index'])
     
     # Sampling: Take 2% of this chunk
-    # Random state is not fixed here to ensure randomness across different file offsets if needed,
-    # but fixing it per chunk is safer for reproducibility.
-    return chunk.sample(frac=0.02, random_state=42)
+    # Bernoulli mask seeded per chunk offset (see process_content_sampling)
+    rng = np.random.default_rng([42, start_byte])
+    return chunk[rng.random(len(chunk)) < 0.02]
 
 
 def process_topic_lifecycle(file_path, start_byte, num_bytes, header_names):
@@ -397,25 +589,24 @@ def process_topic_lifecycle(file_path, start_byte, num_bytes, header_names):
     cols_to_use = ['Topic', 'TimeSlice', 'Popularity']
 
     try:
-        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=cols_to_use)
+        lf = read_csv_lazy(
+            file_path, start_byte, num_bytes, header_names, use_cols=cols_to_use, column_types=AGG_COLUMN_TYPES
+        )
     except pd.errors.EmptyDataError:
         return None
 
-    if chunk.empty:
-        return None
-
     # Remove "TS" prefix from TimeSlice if it exists and convert to int
-    if chunk['TimeSlice'].dtype == 'object':
-        chunk['TimeSlice'] = chunk['TimeSlice'].astype(str).str.replace('TS', '', regex=False)
+    if lf.collect_schema()['TimeSlice'] == pl.String:
+        lf = lf.with_columns(pl.col('TimeSlice').str.strip_prefix('TS'))
     
     # Force numeric conversion for safety
-    chunk['TimeSlice'] = pd.to_numeric(chunk['TimeSlice'], errors='coerce')
-    chunk = chunk.dropna(subset=['TimeSlice', 'Popularity'])
-    chunk['TimeSlice'] = chunk['TimeSlice'].astype(int)
+    lf = lf.with_columns(pl.col('TimeSlice').cast(pl.Int64, strict=False))
+    lf = lf.drop_nulls(subset=['TimeSlice', 'Popularity'])
 
     # Group by Topic + TimeSlice
     # We calculate Sum and Count to allow weighted averaging later
-    return chunk.groupby(['Topic', 'TimeSlice'], observed=False)['Popularity'].agg(['sum', 'count'])
+    agg = aggregate_sum_count(lf, ['Topic', 'TimeSlice'], ['Popularity'])['Popularity']
+    return agg if not agg.empty else None
 
 # --- APPEND TO dynamics_multicore.py ---
 
@@ -426,20 +617,19 @@ def process_platform_lifecycle(file_path, start_byte, num_bytes, header_names):
     cols_to_use = ['Platform', 'TimeSlice', 'Popularity']
 
     try:
-        chunk = read_csv_chunk(file_path, start_byte, num_bytes, header_names, use_cols=cols_to_use)
+        lf = read_csv_lazy(
+            file_path, start_byte, num_bytes, header_names, use_cols=cols_to_use, column_types=AGG_COLUMN_TYPES
+        )
     except pd.errors.EmptyDataError:
         return None
 
-    if chunk.empty:
-        return None
-
     # Clean TimeSlice
-    if chunk['TimeSlice'].dtype == 'object':
-        chunk['TimeSlice'] = chunk['TimeSlice'].astype(str).str.replace('TS', '', regex=False)
+    if lf.collect_schema()['TimeSlice'] == pl.String:
+        lf = lf.with_columns(pl.col('TimeSlice').str.strip_prefix('TS'))
     
-    chunk['TimeSlice'] = pd.to_numeric(chunk['TimeSlice'], errors='coerce')
-    chunk = chunk.dropna(subset=['TimeSlice', 'Popularity'])
-    chunk['TimeSlice'] = chunk['TimeSlice'].astype(int)
+    lf = lf.with_columns(pl.col('TimeSlice').cast(pl.Int64, strict=False))
+    lf = lf.drop_nulls(subset=['TimeSlice', 'Popularity'])
 
     # Group by Platform + TimeSlice
-    return chunk.groupby(['Platform', 'TimeSlice'], observed=False)['Popularity'].agg(['sum', 'count'])
\ No newline at end of file
+    agg = aggregate_sum_count(lf, ['Platform', 'TimeSlice'], ['Popularity'])['Popularity']
+    return agg if not agg.empty else None
\ No newline at end of file